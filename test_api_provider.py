@@ -19,6 +19,10 @@ Environment variables (optional):
   - MONETIZE_PARAMS_JSON: JSON object for query params
   - MONETIZE_TIMEOUT: Request timeout in seconds (float, default: 30)
 
+Requests are sent with httpx (HTTP/2 when 'h2' is installed: pip install 'httpx[http2]');
+if httpx is not available, the script falls back to requests. Brotli and Zstandard
+responses are requested when the HTTP client can decode them (optional: pip install brotli zstandard).
+
 Examples:
   # Simple connectivity test (GET)
   python test_api_provider.py --provider-id 220 --method GET
@@ -50,36 +54,117 @@ Examples:
 from __future__ import annotations
 
 import argparse
+import atexit
+import codecs
 import json
 import os
+import re
 import sys
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import httpx  # type: ignore
+except ImportError:
+    httpx = None
+
+try:
+    import requests  # type: ignore
+except ImportError:
+    requests = None
+
+if httpx is None and requests is None:
+    print(
+        "The 'httpx' or 'requests' package is required. Install it with: pip install 'httpx[http2]'",
+        file=sys.stderr,
+    )
+    sys.exit(1)
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+else:
+    # Older orjson releases silently turn integers wider than 64 bits into floats;
+    # only use it when it rejects them, so printed responses are never altered
+    try:
+        orjson.loads(b"18446744073709551616")
+    except orjson.JSONDecodeError:
+        pass
+    else:
+        orjson = None
 
 
-def _import_requests_or_exit() -> Any:
-    try:
-        import requests  # type: ignore
-        return requests
-    except Exception:
-        print(
-            "The 'requests' package is required. Install it with: pip install requests",
-            file=sys.stderr,
-        )
-        sys.exit(1)
+# Avoid printing extremely long responses fully
+MAX_PRINTED_BODY_CHARS = 50_000
+# UTF-8 needs at most 4 bytes per character, so this many bytes always covers the printed slice
+MAX_TEXT_BODY_BYTES = MAX_PRINTED_BODY_CHARS * 4 + 4
+# JSON bodies larger than this are shown as (truncated) text instead of being parsed
+MAX_JSON_BODY_BYTES = 10 * 1024 * 1024
+
+_SENSITIVE_HEADER_RE = re.compile(r"authorization|api[-_]?key|cookie|token|x-auth-token", re.IGNORECASE)
+
+_HTTPX_CLIENT: Optional[httpx.Client] = None
+_SESSION: Optional[requests.Session] = None
 
 
-def parse_json_argument(argument_name: str, raw_value: Optional[str]) -> Optional[Dict[str, Any]]:
-    if raw_value is None or raw_value.strip() == "":
+def _get_httpx_client() -> httpx.Client:
+    """Return a shared httpx.Client, using HTTP/2 when the optional 'h2' package is installed."""
+    global _HTTPX_CLIENT
+    if _HTTPX_CLIENT is None:
+        limits = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+        # Follow redirects like requests does by default
+        try:
+            client = httpx.Client(http2=True, limits=limits, timeout=30.0, follow_redirects=True)
+        except ImportError:
+            client = httpx.Client(limits=limits, timeout=30.0, follow_redirects=True)
+        atexit.register(client.close)
+        _HTTPX_CLIENT = client
+    return _HTTPX_CLIENT
+
+
+def _get_session() -> requests.Session:
+    """Return a shared requests.Session so repeated calls reuse pooled connections."""
+    global _SESSION
+    if _SESSION is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        atexit.register(session.close)
+        _SESSION = session
+    return _SESSION
+
+
+def _json_loads(raw: bytes) -> Any:
+    """Parse a response body, using orjson when it is installed.
+
+    orjson rejects integers wider than 64 bits, so anything it refuses is re-parsed
+    with the stdlib parser, which keeps such values exact.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
+def _json_dict_arg(raw_value: str) -> Optional[Dict[str, Any]]:
+    """argparse ``type`` for JSON object arguments; blank values and ``null`` yield None."""
+    # Skip blank values without copying the whole string via strip(); json.loads accepts surrounding whitespace
+    index = 0
+    length = len(raw_value)
+    while index < length and raw_value[index].isspace():
+        index += 1
+    if index == length:
         return None
     try:
         parsed = json.loads(raw_value)
-        if parsed is None:
-            return None
-        if not isinstance(parsed, dict):
-            raise ValueError(f"{argument_name} must be a JSON object (e.g. '{{\"key\":\"value\"}}').")
-        return parsed
     except json.JSONDecodeError as decode_error:
-        raise ValueError(f"Invalid JSON for {argument_name}: {decode_error}") from decode_error
+        raise argparse.ArgumentTypeError(f"invalid JSON: {decode_error}") from decode_error
+    if parsed is not None and not isinstance(parsed, dict):
+        raise argparse.ArgumentTypeError("must be a JSON object (e.g. '{\"key\":\"value\"}')")
+    return parsed
 
 
 def build_gateway_url(base_url: str, provider_id_or_slug: str, extra_path: Optional[str]) -> str:
@@ -94,24 +179,61 @@ def build_gateway_url(base_url: str, provider_id_or_slug: str, extra_path: Optio
 def redact_sensitive_headers(headers: Dict[str, Any]) -> Dict[str, Any]:
     if not headers:
         return headers
-    sensitive_keywords = {"authorization", "api-key", "x-api-key", "cookie", "token", "x-auth-token"}
     redacted: Dict[str, Any] = {}
     for key, value in headers.items():
-        lower_key = str(key).lower()
-        if any(s in lower_key for s in sensitive_keywords):
-            redacted[key] = "***"
-        else:
-            redacted[key] = value
+        redacted[key] = "***" if _SENSITIVE_HEADER_RE.search(str(key)) else value
     return redacted
 
 
-def pretty_json(data: Any) -> str:
+def pretty_json(data: Any, sort_keys: bool = False) -> str:
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(data, option=option).decode()
+        except TypeError:
+            pass
     try:
-        return json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True)
+        return json.dumps(data, ensure_ascii=False, indent=2, sort_keys=sort_keys)
     except Exception:
         return str(data)
 
 
+def _read_body(body_chunks: Iterable[bytes], limit: int) -> bytes:
+    """Read at most ``limit`` bytes (plus one chunk) from a streamed response body."""
+    chunks = []
+    size = 0
+    for chunk in body_chunks:
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            break
+    return b"".join(chunks)
+
+
+def _query_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop null values and spell booleans as ``True``/``False``, as requests does, so both clients send the same query."""
+    normalized: Dict[str, Any] = {}
+    for key, value in params.items():
+        if isinstance(value, list):
+            value = [str(item) if isinstance(item, bool) else item for item in value if item is not None]
+        elif isinstance(value, bool):
+            value = str(value)
+        elif value is None:
+            continue
+        normalized[key] = value
+    return normalized
+
+
+def _response_encoding(response: Any) -> str:
+    """Return the response charset if Python knows it, otherwise utf-8."""
+    encoding = response.encoding or "utf-8"
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        return "utf-8"
+    return encoding
+
+
 def make_request(
     method: str,
     url: str,
@@ -120,32 +242,63 @@ def make_request(
     params: Optional[Dict[str, Any]] = None,
     timeout: float = 30.0,
 ) -> Tuple[int, Dict[str, Any], str, Optional[Any]]:
-    requests = _import_requests_or_exit()
+    chunk_size = 64 * 1024
+    query = _query_params(params) if params else {}
+    response: Optional[Any] = None
     try:
-        response = requests.request(
-            method=method.upper(),
-            url=url,
-            headers=headers or {},
-            params=params or {},
-            json=body if body is not None else None,
-            timeout=timeout,
-        )
+        if httpx is not None:
+            client = _get_httpx_client()
+            # httpx replaces an existing query string when params are passed, so merge them explicitly
+            request_url = httpx.URL(url).copy_merge_params(query) if query else url
+            request = client.build_request(
+                method=method,
+                url=request_url,
+                headers=headers or {},
+                json=body,
+                timeout=timeout,
+            )
+            response = client.send(request, stream=True)
+            body_chunks = response.iter_bytes(chunk_size=chunk_size)
+        else:
+            response = _get_session().request(
+                method=method,
+                url=url,
+                headers=headers or {},
+                params=query,
+                json=body if body is not None else None,
+                timeout=timeout,
+                stream=True,
+            )
+            body_chunks = response.iter_content(chunk_size=chunk_size)
 
         status_code = response.status_code
-        response_text = response.text
         response_json: Optional[Any] = None
-        try:
-            response_json = response.json()
-        except ValueError:
-            response_json = None
+        # Only JSON media types (application/json, application/problem+json, ...) are worth parsing
+        content_type = response.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        if content_type.endswith("json"):
+            raw_body = _read_body(body_chunks, MAX_JSON_BODY_BYTES)
+            if len(raw_body) <= MAX_JSON_BODY_BYTES:
+                try:
+                    response_json = _json_loads(raw_body)
+                except ValueError:
+                    response_json = None
+        else:
+            raw_body = _read_body(body_chunks, MAX_TEXT_BODY_BYTES)
+        # Parsed JSON is printed on its own, so only decode a text copy when parsing did not happen or failed
+        response_text = ""
+        if response_json is None:
+            response_text = raw_body[:MAX_TEXT_BODY_BYTES].decode(_response_encoding(response), errors="replace")
 
         # Convert response headers to a regular dict for consistent printing
-        response_headers: Dict[str, Any] = {k: v for k, v in response.headers.items()}
+        response_headers: Dict[str, Any] = dict(response.headers)
         return status_code, response_headers, response_text, response_json
 
     except Exception as request_error:
         print(f"Request failed: {request_error}", file=sys.stderr)
         raise
+    finally:
+        if response is not None:
+            response.close()
 
 
 def main() -> None:
@@ -192,18 +345,21 @@ def main() -> None:
     parser.add_argument(
         "--headers",
         dest="headers",
+        type=_json_dict_arg,
         default=env_headers,
         help="JSON object of headers to forward (env: MONETIZE_HEADERS_JSON)",
     )
     parser.add_argument(
         "--body",
         dest="body",
+        type=_json_dict_arg,
         default=env_body,
         help="JSON object for request body (env: MONETIZE_BODY_JSON)",
     )
     parser.add_argument(
         "--params",
         dest="params",
+        type=_json_dict_arg,
         default=env_params,
         help="JSON object for query params (env: MONETIZE_PARAMS_JSON)",
     )
@@ -217,19 +373,15 @@ def main() -> None:
 
     args = parser.parse_args()
 
-    try:
-        headers = parse_json_argument("--headers", args.headers)
-        body = parse_json_argument("--body", args.body)
-        params = parse_json_argument("--params", args.params)
-    except ValueError as ve:
-        print(str(ve), file=sys.stderr)
-        sys.exit(2)
+    headers = args.headers
+    body = args.body
+    params = args.params
 
     # Default Content-Type to application/json when a JSON body is provided
     if body is not None:
         if headers is None:
             headers = {"Content-Type": "application/json"}
-        elif "Content-Type" not in headers and "content-type" not in {k.lower() for k in headers.keys()}:
+        elif not any(k.lower() == "content-type" for k in headers):
             headers["Content-Type"] = "application/json"
 
     url = build_gateway_url(
@@ -238,20 +390,23 @@ def main() -> None:
         extra_path=args.extra_path,
     )
 
-    # Print request summary
-    print("\n=== API Provider Gateway Request ===")
-    print(f"URL:        {url}")
-    print(f"Method:     {args.method}")
-    print(f"Timeout:    {args.timeout}s")
+    # Print request summary (buffered into a single write)
+    out: List[str] = [
+        "\n=== API Provider Gateway Request ===\n",
+        f"URL:        {url}\n",
+        f"Method:     {args.method}\n",
+        f"Timeout:    {args.timeout}s\n",
+    ]
     if params:
-        print("Query Params:")
-        print(pretty_json(params))
+        out.append("Query Params:\n")
+        out.append(pretty_json(params, sort_keys=True) + "\n")
     if headers:
-        print("Headers (redacted):")
-        print(pretty_json(redact_sensitive_headers(headers)))
+        out.append("Headers (redacted):\n")
+        out.append(pretty_json(redact_sensitive_headers(headers), sort_keys=True) + "\n")
     if body is not None:
-        print("Body:")
-        print(pretty_json(body))
+        out.append("Body:\n")
+        out.append(pretty_json(body, sort_keys=True) + "\n")
+    sys.stdout.write("".join(out))
 
     try:
         status_code, response_headers, response_text, response_json = make_request(
@@ -266,29 +421,46 @@ def main() -> None:
         sys.exit(1)
 
     # Print response summary
-    print("\n=== Response ===")
-    print(f"Status: {status_code}")
+    out = ["\n=== Response ===\n", f"Status: {status_code}\n"]
     if response_headers:
-        print("Headers:")
-        print(pretty_json(response_headers))
+        out.append("Headers:\n")
+        out.append(pretty_json(response_headers) + "\n")
     if response_json is not None:
-        print("JSON Body:")
-        print(pretty_json(response_json))
-    else:
-        print("Text Body:")
-        # Avoid printing extremely long responses fully
-        max_len = 50_000
-        if len(response_text) > max_len:
-            print(response_text[:max_len] + "\n... [truncated]")
+        out.append("JSON Body:\n")
+        out.append(pretty_json(response_json) + "\n")
+    elif response_text:
+        out.append("Text Body:\n")
+        sys.stdout.write("".join(out))
+        out = []
+        if len(response_text) > MAX_PRINTED_BODY_CHARS:
+            body_text = response_text[:MAX_PRINTED_BODY_CHARS]
+            suffix = "\n... [truncated]\n"
+        else:
+            body_text = response_text
+            suffix = "\n"
+        # Write the (possibly large) body straight to the byte buffer, bypassing the text layer's
+        # newline scanning; text-only streams (e.g. sys.stdout replaced by io.StringIO) have no buffer
+        stdout_buffer = getattr(sys.stdout, "buffer", None)
+        if stdout_buffer is None:
+            sys.stdout.write(body_text)
+            sys.stdout.write(suffix)
         else:
-            print(response_text)
+            # Match the text layer's encoding so the body and the summary are encoded consistently
+            stdout_encoding = sys.stdout.encoding or "utf-8"
+            sys.stdout.flush()
+            stdout_buffer.write(body_text.encode(stdout_encoding, errors="replace"))
+            stdout_buffer.write(suffix.encode(stdout_encoding, errors="replace"))
+            stdout_buffer.flush()
 
     # Helpful hints for common auth issues
     if status_code in (401, 403):
-        print("\nHint: Received 401/403 from gateway.")
-        print("- If your API key is stored in the provider settings, do not send Authorization; the gateway forwards it.")
-        print("- If the platform requires user/session auth, include your session cookie in --headers (Cookie: ...).")
-        print("- Ensure the extra path and method match the target API (e.g., chat/completions with POST).")
+        out.append("\nHint: Received 401/403 from gateway.\n")
+        out.append("- If your API key is stored in the provider settings, do not send Authorization; the gateway forwards it.\n")
+        out.append("- If the platform requires user/session auth, include your session cookie in --headers (Cookie: ...).\n")
+        out.append("- Ensure the extra path and method match the target API (e.g., chat/completions with POST).\n")
+
+    if out:
+        sys.stdout.write("".join(out))
 
 
 if __name__ == "__main__":